@@ -0,0 +1,41 @@
+import dataclasses
+
+from .modrinth import VersionFile
+
+
+__all__ = (
+    "VersionFileHashesLite",
+    "VersionFileLite",
+)
+
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class VersionFileHashesLite:
+    """Plain mirror of VersionFileHashes for the download pipeline."""
+    sha1: str | None = None
+    sha512: str | None = None
+
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class VersionFileLite:
+    """Plain mirror of VersionFile for the download pipeline.
+
+    The pipeline constructs and hashes these constantly (they key the
+    download bookkeeping dicts); the values were already validated at the
+    API boundary, so re-paying pydantic overhead there is wasted work.
+    """
+    hashes: VersionFileHashesLite
+    url: str
+    filename: str
+    primary: bool
+    size: int
+
+    @classmethod
+    def from_modrinth(cls, file: VersionFile) -> "VersionFileLite":
+        return cls(
+            hashes=VersionFileHashesLite(sha1=file.hashes.sha1, sha512=file.hashes.sha512),
+            url=file.url,
+            filename=file.filename,
+            primary=file.primary,
+            size=file.size,
+        )
@@ -1,11 +1,15 @@
 import datetime
 import enum
 import typing
-from pydantic import BaseModel, Field, HttpUrl
+from pydantic import BaseModel, ConfigDict, Field, PrivateAttr
 
 
 __all__ = (
     "SearchIndexEnum",
+    "ProjectStatusEnum",
+    "ProjectTypeEnum",
+    "VersionTypeEnum",
+    "VersionStatusEnum",
     "CLIENT_SIDE",
     "SERVER_SIDE",
     "STATUS",
@@ -36,36 +40,54 @@ class SearchIndexEnum(enum.Enum):
     UPDATED = "updated"
 
 
+class ProjectStatusEnum(str, enum.Enum):
+    APPROVED = "approved"
+    ARCHIVED = "archived"
+    REJECTED = "rejected"
+    DRAFT = "draft"
+    UNLISTED = "unlisted"
+    PROCESSING = "processing"
+    WITHHELD = "withheld"
+    SCHEDULED = "scheduled"
+    PRIVATE = "private"
+    UNKNOWN = "unknown"
+
+
+class ProjectTypeEnum(str, enum.Enum):
+    MOD = "mod"
+    MODPACK = "modpack"
+    RESOURCEPACK = "resourcepack"
+    SHADER = "shader"
+
+
+class VersionTypeEnum(str, enum.Enum):
+    RELEASE = "release"
+    BETA = "beta"
+    ALPHA = "alpha"
+
+
+class VersionStatusEnum(str, enum.Enum):
+    LISTED = "listed"
+    ARCHIVED = "archived"
+    DRAFT = "draft"
+    UNLISTED = "unlisted"
+    SCHEDULED = "scheduled"
+    UNKNOWN = "unknown"
+
+
 CLIENT_SIDE = SERVER_SIDE = typing.Literal["required", "optional", "unsupported"]
-STATUS = typing.Literal[
-    "approved",
-    "archived",
-    "rejected",
-    "draft",
-    "unlisted",
-    "processing",
-    "withheld",
-    "scheduled",
-    "private",
-    "unknown"
-]
+# Kept as aliases of the enums above so existing annotations keep working.
+STATUS = ProjectStatusEnum
 REQUESTED_STATUS = typing.Literal[
     "approved", "archived", "unlisted", "private", "draft"
 ]
-PROJECT_TYPE = typing.Literal["mod", "modpack", "resourcepack", "shader"]
+PROJECT_TYPE = ProjectTypeEnum
 MONETIZATION_STATUS = typing.Literal[
     "monetized", "demonetized", "force-demonetized"
 ]
 DEPENDENCY_TYPE = typing.Literal["required", "optional", "incompatible", "embedded"]
-VERSION_TYPE = typing.Literal["release", "beta", "alpha"]
-VERSION_STATUS = typing.Literal[
-    "listed",
-    "archived",
-    "draft",
-    "unlisted",
-    "scheduled",
-    "unknown"
-]
+VERSION_TYPE = VersionTypeEnum
+VERSION_STATUS = VersionStatusEnum
 VERSION_REQUESTED_STATUS = typing.Literal[
     "listed",
     "archived",
@@ -74,9 +96,15 @@ VERSION_REQUESTED_STATUS = typing.Literal[
 ]
 
 
+# Shared DTO config: responses are read-only, several models key dicts in the
+# download pipeline (frozen), and unknown keys should cost nothing (ignore).
+_MODEL_CONFIG = ConfigDict(frozen=True, extra="ignore", validate_default=False)
+
+
 class DonationObject(BaseModel):
     """Represents a donation URL for a project."""
-    url: HttpUrl = Field(description="The URL to the donation page")
+    model_config = _MODEL_CONFIG
+    url: str = Field(description="The URL to the donation page")
     platform: str = Field(description="The platform that the donation page is on")
     id: str = Field(description="The ID of the donation platform")
     
@@ -86,8 +114,9 @@ class DonationObject(BaseModel):
 
 class LicenseObject(BaseModel):
     """Represents a license for a project."""
+    model_config = _MODEL_CONFIG
     name: str = Field(description="The name of the license")
-    url: HttpUrl | None = Field(
+    url: str | None = Field(
         None,
         description="The URL to the license text or information"
     )
@@ -98,7 +127,14 @@ class LicenseObject(BaseModel):
 
 
 class Project(BaseModel):
-    """Represents a project hosted on Modrinth."""
+    """Represents a project hosted on Modrinth.
+
+    Moderation-only fields that modman never reads (the full description
+    body, thread/monetization/queue metadata) are deliberately left out and
+    ignored, so they cost nothing to validate.
+    """
+    model_config = _MODEL_CONFIG
+
     slug: str = Field(
         description="The slug or vanity URL of the project",
         pattern=r"^[\w!@$()`.+,\"\-']{3,64}$",
@@ -110,7 +146,6 @@ class Project(BaseModel):
     categories: list[str] = Field(description="A list of the categories that the project has")
     client_side: CLIENT_SIDE = Field(description="The client side support of the project")
     server_side: SERVER_SIDE = Field(description="The server side support of the project")
-    body: str = Field(description="The full description of the project")
     status: STATUS = Field(description="The status of the project")
     requested_status: REQUESTED_STATUS | None = Field(
         None,
@@ -120,19 +155,19 @@ class Project(BaseModel):
         [],
         description="A list of non-primary additional categories"
     )
-    issues_url: HttpUrl | None = Field(
+    issues_url: str | None = Field(
         None,
         description="The URL to the issue tracker of the project"
     )
-    source_url: HttpUrl | None = Field(
+    source_url: str | None = Field(
         None,
         description="The URL to the source code of the project"
     )
-    wiki_url: HttpUrl | None = Field(
+    wiki_url: str | None = Field(
         None,
         description="The URL to the wiki or documentation of the project"
     )
-    discord_url: HttpUrl | None = Field(
+    discord_url: str | None = Field(
         None,
         description="The URL to the Discord server of the project"
     )
@@ -142,49 +177,39 @@ class Project(BaseModel):
     )
     project_type: PROJECT_TYPE = Field(description="The type of project")
     downloads: int = Field(description="The number of downloads the project has")
-    icon_url: HttpUrl | None = Field(None, description="The URL to the icon of the project")
+    icon_url: str | None = Field(None, description="The URL to the icon of the project")
     color: int | None = Field(None, description="The RGB color of the project")
-    thread_id: str | None = Field(
-        None,
-        description="The ID of the moderation thread associated with this project"
-    )
-    monetization_status: MONETIZATION_STATUS | None = Field(
-        None,
-        description="The monetization status of the project"
-    )
     id: str = Field(description="The ID of the project, encoded in base62")
     team: str = Field(description="The team that owns the project")
     published: datetime.datetime = Field(description="The date and time the project was published")
     updated: datetime.datetime = Field(description="The date and time the project was last updated")
-    approved: datetime.datetime | None = Field(
-        None,
-        description="The date and time the project was approved"
-    )
-    queued: datetime.datetime | None = Field(
-        None,
-        description="The date and time the project was queued for approval"
-    )
     followers: int = Field(description="The number of followers the project has")
     license: LicenseObject = Field(description="The license of the project")
     versions: list[str] = Field(description="A list of the version IDs of the project")
     game_versions: list[str] = Field(description="A list of the game versions the project supports")
     
+    # Normalised (id, title, slug), computed once per model - related() is
+    # called O(projects x identifiers) when resolving dependency trees.
+    _norm: frozenset[str] = PrivateAttr(default=frozenset())
+
     def __hash__(self):
         return hash((self.id, self.slug, self.title))
 
+    def model_post_init(self, __context) -> None:
+        self._norm = frozenset((
+            self.id.strip().casefold(),
+            self.title.strip().casefold(),
+            self.slug.strip().casefold(),
+        ))
+
     def related(self, target: str) -> bool:
         """Checks that <identifier> relates to this project"""
-        if target.strip().lower() == self.id.strip().lower():
-            return True
-        if target.strip().casefold() == self.title.strip().casefold():
-            return True
-        if target.strip().casefold() == self.slug.strip().casefold():
-            return True
-        return False
+        return target.strip().casefold() in self._norm
 
 
 class ProjectSearchResultPage(BaseModel):
     """Represents a page of results from /search."""
+    model_config = _MODEL_CONFIG
     hits: list[Project] = Field(description="The results")
     offset: int = Field(description="The number of results that were skipped by the query")
     limit: int = Field(description="The number of results that were returned by the query")
@@ -196,6 +221,7 @@ class ProjectSearchResultPage(BaseModel):
 
 class VersionDependency(BaseModel):
     """Represents a dependency of a version."""
+    model_config = _MODEL_CONFIG
     version_id: str | None = Field(None, description="The ID of the version that this version depends on")
     project_id: str | None = Field(None, description="The ID of the project that this version depends on")
     file_name: str | None = Field(
@@ -210,6 +236,7 @@ class VersionDependency(BaseModel):
 
 class VersionFileHashes(BaseModel):
     """Represents the hashes of a version file."""
+    model_config = _MODEL_CONFIG
     sha1: str | None = Field(None, description="The SHA1 hash of the file")
     sha512: str | None = Field(None, description="The SHA512 hash of the file")
     
@@ -218,8 +245,10 @@ class VersionFileHashes(BaseModel):
 
 
 class VersionFile(BaseModel):
+    model_config = _MODEL_CONFIG
+
     hashes: VersionFileHashes = Field(description="The hashes of the file")
-    url: HttpUrl = Field(description="The URL to the file")
+    url: str = Field(description="The URL to the file")
     filename: str = Field(description="The name of the file")
     primary: bool = Field(description="Whether the file is the primary file of the version")
     size: int = Field(description="The size of the file in bytes")
@@ -230,6 +259,7 @@ class VersionFile(BaseModel):
 
 class Version(BaseModel):
     """Represents a version of a project."""
+    model_config = _MODEL_CONFIG
     name: str = Field(description="The name of the version")
     version_number: str = Field(description="The version number. Ideally will follow semantic versioning")
     changelog: str | None = Field(None, description="The changelog for the version")
@@ -256,5 +286,6 @@ class Version(BaseModel):
 
 class AllProjectDependencies(BaseModel):
     """Represents the result of /project/:id/dependencies."""
+    model_config = _MODEL_CONFIG
     projects: list[Project] = Field(description="The projects that the project depends on")
     versions: list[Version] = Field(description="The versions that the project depends on")
@@ -1,15 +1,20 @@
-import json
+import contextlib
+import hashlib
 import math
+import pathlib
 import textwrap
 import time
 import typing
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
+import appdirs
 import httpx
 import importlib.metadata
 import logging
+import orjson
 
 import rich
-from rich.progress import Progress
+from pydantic import TypeAdapter, ValidationError
 from .models.modrinth import *
 
 
@@ -19,6 +24,14 @@ except importlib.metadata.PackageNotFoundError:
     _version = "0.1.dev1"
 
 
+# Built once - constructing a TypeAdapter builds a fresh pydantic-core validator,
+# which is far more expensive than re-using it.
+_PROJECT_LIST_ADAPTER = TypeAdapter(list[Project])
+_VERSION_LIST_ADAPTER = TypeAdapter(list[Version])
+_VERSION_ADAPTER = TypeAdapter(Version)
+_PROJECT_ADAPTER = TypeAdapter(Project)
+
+
 class ModrinthAPI:
     USER_AGENT = f"modman/{_version} (https://github.com/nexy7574/modman-v2)"
 
@@ -43,31 +56,54 @@ class ModrinthAPI:
 
         self.ratelimit_reset = 0
         self.ratelimit_remaining = 500
+        self._http_cache_dir = pathlib.Path(appdirs.user_cache_dir("modman")) / "http"
+        self._http_cache_dir.mkdir(parents=True, exist_ok=True)
 
     def __del__(self):
         if self.__cleanup_client:
             self.log.debug("Disposing of internal client.")
             self.http.close()
 
-    def _get(self, url: str, params: dict[str, typing.Any] = None) -> dict | list:
+    def _cache_path(self, url: str, params: dict[str, typing.Any] | None) -> pathlib.Path:
+        key = "%s?%r" % (url, sorted((params or {}).items()))
+        return self._http_cache_dir / hashlib.sha256(key.encode()).hexdigest()
+
+    def _get_raw(
+            self,
+            url: str,
+            params: dict[str, typing.Any] = None,
+            *,
+            show_status: bool = True,
+    ) -> bytes:
         if self.ratelimit_remaining == 0:
-            self.log.warning("Ratelimit reached, waiting %s seconds", self.ratelimit_reset)
-            with Progress() as progress:
-                now = time.time()
-                wait_seconds = math.ceil(self.ratelimit_reset - now)
-                task = progress.add_task("Waiting for rate-limit.", total=wait_seconds)
-                for i in range(wait_seconds):
-                    time.sleep(1)
-                    progress.update(task, advance=1)
+            # One sleep for the whole window - sleeping a second at a time just
+            # stacks scheduler jitter on top and rounds the wait up.
+            wait_seconds = max(math.ceil(self.ratelimit_reset - time.time()), 0)
+            if wait_seconds:
+                self.log.warning("Ratelimit reached, waiting %s seconds", wait_seconds)
+                wait_status = (
+                    rich.get_console().status("Waiting %ds for rate-limit." % wait_seconds)
+                    if show_status else contextlib.nullcontext()
+                )
+                with wait_status:
+                    time.sleep(wait_seconds)
         self.log.debug(
             "Ratelimit has %d hits left, resets in %d seconds",
             self.ratelimit_remaining,
             self.ratelimit_reset
         )
-        with rich.get_console().status("[cyan dim]GET " + url):
+        # Modrinth sends ETags; revalidating lets a 304 skip the body transfer
+        # (and, upstream, re-parsing a payload we already have on disk).
+        cache_path = self._cache_path(url, params)
+        etag_path = cache_path.with_suffix(".etag")
+        headers = {}
+        if etag_path.exists() and cache_path.exists():
+            headers["If-None-Match"] = etag_path.read_text()
+        status = rich.get_console().status("[cyan dim]GET " + url) if show_status else contextlib.nullcontext()
+        with status:
             for i in range(5):
                 try:
-                    response = self.http.get(url, params=params)
+                    response = self.http.get(url, params=params, headers=headers)
                 except httpx.ConnectError:
                     self.log.warning("Connection error, retrying...")
                     continue
@@ -78,11 +114,23 @@ class ModrinthAPI:
         self.ratelimit_remaining = int(response.headers.get("x-ratelimit-remaining", 100))
         if response.status_code == 429:
             self.log.warning("Request was rate-limited, re-calling.")
-            return self._get(url, params)
+            return self._get_raw(url, params, show_status=show_status)
+        if response.status_code == 304:
+            self.log.debug("Not modified, using cached response for %s", url)
+            return cache_path.read_bytes()
         self.log.debug(textwrap.shorten(response.text, 10240))
         if response.status_code not in range(200, 300):
             response.raise_for_status()
-        return response.json()
+        if "etag" in response.headers:
+            try:
+                cache_path.write_bytes(response.content)
+                etag_path.write_text(response.headers["etag"])
+            except OSError as e:
+                self.log.debug("Failed to write response cache: %s", e)
+        return response.content
+
+    def _get(self, url: str, params: dict[str, typing.Any] = None) -> dict | list:
+        return orjson.loads(self._get_raw(url, params))
 
     def search(
             self,
@@ -111,20 +159,24 @@ class ModrinthAPI:
         :param identifiers: An iterable of names, IDs, or slugs.
         :return: a list of found projects.
         """
+        # Duplicate identifiers only waste bandwidth and parse time.
+        identifiers = tuple(dict.fromkeys(identifiers))
         if not identifiers:
             return []
-        projects = []
 
-        response = self._get("/projects", params={"ids": json.dumps(identifiers)})
-        for project in response:
-            try:
-                parsed = Project(**project)
-            except Exception as e:
-                self.log.warning("Failed to parse project: %s", e)
-                continue
-            projects.append(parsed)
-
-        return projects
+        raw = self._get_raw("/projects", params={"ids": orjson.dumps(identifiers).decode()})
+        try:
+            return _PROJECT_LIST_ADAPTER.validate_json(raw)
+        except ValidationError:
+            # One bad entry shouldn't discard the whole batch; fall back to
+            # per-element validation and drop the offenders.
+            projects = []
+            for project in orjson.loads(raw):
+                try:
+                    projects.append(Project.model_validate(project))
+                except ValidationError as e:
+                    self.log.warning("Failed to parse project: %s", e)
+            return projects
 
     def fetch_project(
             self,
@@ -136,9 +188,18 @@ class ModrinthAPI:
         :param identifier: The project's name, ID, or slug.
         :return: The project, if available.
         """
+        # The dedicated endpoint returns the bare object - no surrounding
+        # array to parse, and a 404 tells us "not found" directly.
         try:
-            return self.fetch_projects(identifier).pop()
-        except IndexError:
+            raw = self._get_raw(f"/project/{identifier}")
+        except httpx.HTTPStatusError as e:
+            if e.response.status_code == 404:
+                return
+            raise
+        try:
+            return _PROJECT_ADAPTER.validate_json(raw)
+        except ValidationError as e:
+            self.log.warning("Failed to parse project: %s", e)
             return
 
     def fetch_versions(
@@ -151,20 +212,24 @@ class ModrinthAPI:
         :param identifiers: An iterable of names, IDs, or slugs.
         :return: a list of found versions.
         """
+        identifiers = tuple(dict.fromkeys(identifiers))
         if not identifiers:
             return []
-        versions = []
 
-        response = self._get("/versions", params={"ids": json.dumps(identifiers)})
-        for version in response:
-            try:
-                parsed = Version(**version)
-            except Exception as e:
-                self.log.warning("Failed to parse version: %s", e)
-                continue
-            versions.append(parsed)
+        raw = self._get_raw("/versions", params={"ids": orjson.dumps(identifiers).decode()})
+        return self._parse_version_list(raw)
 
-        return versions
+    def _parse_version_list(self, raw: bytes) -> list[Version]:
+        try:
+            return _VERSION_LIST_ADAPTER.validate_json(raw)
+        except ValidationError:
+            versions = []
+            for version in orjson.loads(raw):
+                try:
+                    versions.append(Version.model_validate(version))
+                except ValidationError as e:
+                    self.log.warning("Failed to parse version: %s", e)
+            return versions
 
     def fetch_version(self, identifier: str) -> Version | None:
         """
@@ -174,8 +239,15 @@ class ModrinthAPI:
         :return: The version, if available.
         """
         try:
-            return self.fetch_versions(identifier).pop()
-        except IndexError:
+            raw = self._get_raw(f"/version/{identifier}")
+        except httpx.HTTPStatusError as e:
+            if e.response.status_code == 404:
+                return
+            raise
+        try:
+            return _VERSION_ADAPTER.validate_json(raw)
+        except ValidationError as e:
+            self.log.warning("Failed to parse version: %s", e)
             return
 
     def fetch_project_versions(
@@ -196,26 +268,74 @@ class ModrinthAPI:
         """
         if not isinstance(project, str):
             project = project.id
+        return self._fetch_project_versions(project, loaders, game_versions, featured)
 
-        versions = []
+    def fetch_all_project_versions(
+            self,
+            projects: typing.Iterable[Project | str],
+            loaders: list[str] | None = None,
+            game_versions: list[str] | None = None,
+            featured: bool | None = None,
+            *,
+            concurrency: int = 4,
+    ) -> dict[str, list[Version]]:
+        """
+        Fetches the versions of several projects concurrently.
+
+        Resolving a dependency tree is latency-bound, not CPU-bound, so the
+        per-project requests are issued from a thread pool (the same approach
+        the download pipeline uses) instead of one at a time.
+
+        :param projects: The projects or project identifiers to fetch versions for.
+        :param loaders: A list of loaders to filter by.
+        :param game_versions: A list of game versions to filter by.
+        :param featured: Whether to only fetch featured versions.
+        :param concurrency: How many requests to have in flight at once.
+        :return: A mapping of project ID to its versions.
+        """
+        identifiers = [p if isinstance(p, str) else p.id for p in projects]
+        if not identifiers:
+            return {}
+
+        results: dict[str, list[Version]] = {}
+        with rich.get_console().status("[cyan dim]Fetching versions for %d projects" % len(identifiers)):
+            with ThreadPoolExecutor(max_workers=concurrency) as executor:
+                futures = {
+                    executor.submit(
+                        self._fetch_project_versions,
+                        identifier,
+                        loaders,
+                        game_versions,
+                        featured,
+                        show_status=False,
+                    ): identifier
+                    for identifier in identifiers
+                }
+                for future in as_completed(futures):
+                    results[futures[future]] = future.result()
+        return results
+
+    def _fetch_project_versions(
+            self,
+            project: str,
+            loaders: list[str] | None,
+            game_versions: list[str] | None,
+            featured: bool | None,
+            *,
+            show_status: bool = True,
+    ) -> list[Version]:
+        # show_status must be off in worker threads - rich only allows one
+        # live display at a time.
         query = {}
         if loaders:
-            query["loaders"] = json.dumps(loaders)
+            query["loaders"] = orjson.dumps(loaders).decode()
         if game_versions:
-            query["game_versions"] = json.dumps(game_versions)
+            query["game_versions"] = orjson.dumps(game_versions).decode()
         if featured is not None:
-            query["featured"] = json.dumps(featured)
-
-        response = self._get(f"/project/{project}/version", params=query)
-        for version in response:
-            try:
-                parsed = Version(**version)
-            except Exception as e:
-                self.log.warning("Failed to parse version: %s", e)
-                continue
-            versions.append(parsed)
+            query["featured"] = orjson.dumps(featured).decode()
 
-        return versions
+        raw = self._get_raw(f"/project/{project}/version", params=query, show_status=show_status)
+        return self._parse_version_list(raw)
 
     def fetch_version_from_file_hash(
             self,
@@ -230,22 +350,19 @@ class ModrinthAPI:
         :param algorithm: SHA1 or SHA512, defaults to SHA512.
         :return: The found version, if available.
         """
-        response = self._get(f"/version_file/{file_hash}", params={"algorithm": algorithm})
+        raw = self._get_raw(f"/version_file/{file_hash}", params={"algorithm": algorithm})
         try:
-            return Version(**response)
-        except Exception as e:
+            return _VERSION_ADAPTER.validate_json(raw)
+        except ValidationError as e:
             self.log.warning("Failed to parse version: %s", e)
             return
 
     @staticmethod
-    def get_primary_file(*files: VersionFile) -> VersionFile:
+    def get_primary_file(files: typing.Sequence[VersionFile]) -> VersionFile:
         """
         Returns the primary file from a list of version files.
 
         :param files: The files to search through.
         :return: The primary file.
         """
-        for file in files:
-            if file.primary:
-                return file
-        return files[0]
+        return next((file for file in files if file.primary), files[0])
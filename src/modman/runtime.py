@@ -1,7 +1,9 @@
+import errno
 import logging
+import os
 import pathlib
 import shutil
-from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
 
 import appdirs
 import hashlib
@@ -18,6 +20,7 @@ from rich.progress import (
     TransferSpeedColumn,
 )
 from .modrinth import ModrinthAPI
+from .models.internal import VersionFileLite
 from .models.modrinth import *
 
 
@@ -26,7 +29,23 @@ class ModManRuntime:
         self.log = logging.getLogger("modman.runtime")
         self.config = config
         self.config.setdefault("modman", {})
-        self.modrinth = ModrinthAPI()
+        concurrent = self.config["modman"].get("concurrent_downloads", 3)
+        # One pooled HTTP/2 client shared by metadata fetches and downloads -
+        # the CDN multiplexes concurrent downloads over a single connection
+        # instead of paying a TCP+TLS handshake per file.
+        self.http = httpx.Client(
+            headers={"User-Agent": ModrinthAPI.USER_AGENT},
+            follow_redirects=True,
+            max_redirects=5,
+            base_url=self.base_url,
+            http2=True,
+            limits=httpx.Limits(
+                max_keepalive_connections=concurrent,
+                max_connections=concurrent * 2,
+            ),
+            timeout=httpx.Timeout(30.0, connect=10.0),
+        )
+        self.modrinth = ModrinthAPI(self.http)
         self.cache_dir = pathlib.Path(appdirs.user_cache_dir("modman"))
         self.cache_dir.mkdir(parents=True, exist_ok=True)
         self.console = rich.get_console()
@@ -39,35 +58,65 @@ class ModManRuntime:
             return u[:-1]
         return u
 
-    def _get_cached_file(self, file: VersionFile) -> pathlib.Path | None:
+    def _get_cached_file(self, file: VersionFileLite) -> pathlib.Path | None:
         f = self.cache_dir / file.filename
         if f.exists():
             return f.resolve()
 
+    @staticmethod
+    def _move_file(source: pathlib.Path, destination: pathlib.Path) -> pathlib.Path:
+        """Moves source to destination, atomically when both share a filesystem."""
+        try:
+            source.rename(destination)
+        except OSError as e:
+            if e.errno != errno.EXDEV:
+                raise
+            # Different filesystem: copy to a temporary name next to the
+            # target, then swap it into place atomically.
+            tmp = destination.with_name(destination.name + ".part")
+            shutil.copyfile(source, tmp)
+            os.replace(tmp, destination)
+            source.unlink()
+        return destination
+
     @staticmethod
     def _verify_file(path: pathlib.Path, method: str = "sha1", expected: str = None) -> bool:
-        hasher = hashlib.new(method)
         with open(path, "rb") as f:
-            while chunk := f.read(4096):
-                hasher.update(chunk)
-        return hasher.hexdigest() == expected
+            if hasattr(hashlib, "file_digest"):
+                # 3.11+: hashes in C with large buffers, releasing the GIL.
+                digest = hashlib.file_digest(f, method).hexdigest()
+            else:
+                hasher = hashlib.new(method)
+                while chunk := f.read(1 << 20):
+                    hasher.update(chunk)
+                digest = hasher.hexdigest()
+        return digest == expected
 
-    def _download_file(self, task_id: TaskID, progress: Progress, client: httpx.Client, file: VersionFile):
+    def _download_file(self, task_id: TaskID, progress: Progress, client: httpx.Client, file: VersionFileLite):
+        # Hash the stream as it arrives so the file never has to be re-read
+        # from disk just to verify it.
+        hasher = hashlib.new("sha1")
         # noinspection PyArgumentList
-        with client.stream("GET", str(file.url)) as response:
+        with client.stream("GET", file.url) as response:
             response.raise_for_status()
             total = int(response.headers.get("Content-Length", 1))
             progress.update(task_id, total=total)
-            with open(self.cache_dir / file.filename, "wb") as f:
-                for chunk in response.iter_bytes(128000):
+            # 1 MiB chunks straight to the fd - the chunks are far bigger than
+            # Python's write buffer, so buffering would only add a memcpy.
+            with open(self.cache_dir / file.filename, "wb", buffering=0) as f:
+                for chunk in response.iter_bytes(1 << 20):
                     f.write(chunk)
+                    hasher.update(chunk)
                     progress.update(task_id, advance=len(chunk))
+        if file.hashes.sha1 and hasher.hexdigest() != file.hashes.sha1:
+            raise RuntimeError("File integrity check failed for %r" % file.filename)
+        self.log.info("File %r verified", file.filename)
 
     def download_files(
             self,
             files: list[VersionFile],
             destination: pathlib.Path,
-    ) -> dict[VersionFile, pathlib.Path]:
+    ) -> dict[VersionFileLite, pathlib.Path]:
         """Downloads the given files to a cache, verifies, and then moves them.
 
         Any files found in the cache will be re-checked, and the download will be skipped.
@@ -75,24 +124,31 @@ class ModManRuntime:
 
         :param files: The list of files to download.
         :param destination: The directory to move the files to.
-        :return: A dictionary of VersionFile -> Path pairs.
+        :return: A dictionary of VersionFileLite -> Path pairs.
         """
-        locations: dict[VersionFile, pathlib.Path] = {}
-        downloads: dict[VersionFile, pathlib.Path | None] = {}
-        for file in files:
-            downloads[file] = None
-            self.log.debug("Checking if %r is already cached", file)
-            cached_file = self._get_cached_file(file)
-            if cached_file:
-                self.log.info("Verifying file %r", cached_file)
-                with self.console.status("Verifying file %r" % file.filename):
+        # Convert once at the boundary - the pipeline below keys dicts by file,
+        # which is far cheaper with the frozen dataclass mirrors.
+        files = [VersionFileLite.from_modrinth(file) for file in files]
+        locations: dict[VersionFileLite, pathlib.Path] = {}
+        downloads: dict[VersionFileLite, pathlib.Path | None] = {}
+        # One status for the whole pass - entering/exiting a rich status per
+        # file spins a render thread up and down each time, which dwarfs the
+        # hash itself for small cache hits.
+        with self.console.status("Checking cached files...") as status:
+            for file in files:
+                downloads[file] = None
+                self.log.debug("Checking if %r is already cached", file)
+                cached_file = self._get_cached_file(file)
+                if cached_file:
+                    self.log.info("Verifying file %r", cached_file)
+                    status.update("Verifying file %r" % file.filename)
                     if not self._verify_file(cached_file, expected=file.hashes.sha1):
                         raise RuntimeError("File integrity check failed for %r" % file.filename)
                     else:
                         self.log.info("File %r verified", file.filename)
                         downloads[file] = cached_file
-            else:
-                self.log.info("%r is not downloaded. Will download.")
+                else:
+                    self.log.info("%r is not downloaded. Will download.")
 
         with Progress(
                 TextColumn("[bold blue]{task.fields[filename]}", justify="right"),
@@ -105,37 +161,39 @@ class ModManRuntime:
                 "•",
                 TimeRemainingColumn(),
         ) as progress:
-            with httpx.Client(
-                headers={"User-Agent": ModrinthAPI.USER_AGENT}
-            ) as client:
-                with ThreadPoolExecutor(self.config["modman"].get("concurrent_downloads", 3)) as executor:
-                    tasks = {}
-                    for file in files:
-                        if downloads[file]:
-                            continue
-                        task_id = progress.add_task(file.filename, filename=file.filename)
-                        tasks[task_id] = executor.submit(
-                            self._download_file,
-                            task_id,
-                            progress,
-                            client,
-                            file,
-                        )
+            with ThreadPoolExecutor(self.config["modman"].get("concurrent_downloads", 3)) as executor:
+                futures: dict[Future, VersionFileLite] = {}
+                fresh: set[VersionFileLite] = set()
+                for file in files:
+                    if downloads[file]:
+                        continue
+                    fresh.add(file)
+                    task_id = progress.add_task(file.filename, filename=file.filename)
+                    futures[executor.submit(
+                        self._download_file,
+                        task_id,
+                        progress,
+                        self.http,
+                        file,
+                    )] = file
 
-                    for task_id, future in tasks.items():
-                        future.result()
-                        downloads[files[task_id]] = self.cache_dir / files[task_id].filename
+                for future in as_completed(futures):
+                    file = futures[future]
+                    future.result()
+                    downloads[file] = self.cache_dir / file.filename
 
         with self.console.status("Verifying & moving downloads...") as status:
             for file, cached_file in downloads.items():
                 if not cached_file:
                     logging.warning("File %r was not downloaded", file.filename)
                     continue
-                status.update("Verifying file %r" % file.filename)
-                if not self._verify_file(cached_file, expected=file.hashes.sha1):
-                    raise RuntimeError("File integrity check failed for %r" % file.filename)
-                else:
+                # Freshly downloaded files were hashed in-flight by
+                # _download_file; only cache hits need re-reading here.
+                if file not in fresh:
+                    status.update("Verifying file %r" % file.filename)
+                    if not self._verify_file(cached_file, expected=file.hashes.sha1):
+                        raise RuntimeError("File integrity check failed for %r" % file.filename)
                     self.log.info("File %r verified", file.filename)
-                    status.update("Moving file %r" % file.filename)
-                    locations[file] = shutil.move(cached_file, destination / file.filename)
+                status.update("Moving file %r" % file.filename)
+                locations[file] = self._move_file(cached_file, destination / file.filename)
         return locations